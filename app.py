@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import os
-import datetime
+import concurrent.futures
+import hmac
 from typing import Optional
 
 from flask import Flask, render_template, request, redirect, url_for
@@ -12,6 +13,27 @@ import captu_image as core
 
 app = Flask(__name__)
 
+# Pré-chauffage au démarrage: ouverture de la caméra et chargement des
+# modèles dlib, pour ne pas pénaliser la première requête.
+core.warm_up()
+
+# Mot de passe attendu, lu une seule fois à l'import (pas de lecture
+# d'os.environ à chaque requête).
+_CORRECT_PASSWORD = os.environ.get("CAPTURE_PASSWORD", "monSecret").encode()
+
+# Pool pour la capture/sauvegarde en arrière-plan: la réponse HTTP ne
+# dépend pas de l'écriture du fichier.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+
+def _capture_and_save(out_path: str) -> None:
+    """Capture une frame et l'enregistre; les erreurs sont journalisées."""
+    try:
+        frame = core.capture_frame()
+        core.save_image(out_path, frame, params=core.JPEG_PARAMS)
+    except Exception:
+        app.logger.exception("Échec de la capture photo en arrière-plan (%s)", out_path)
+
 
 def verify_password_and_act(submitted_password: str) -> dict:
     """Vérifie le mot de passe et applique les actions définies dans le module core.
@@ -29,35 +51,29 @@ def verify_password_and_act(submitted_password: str) -> dict:
         "person": None,
     }
 
-    correct_password = os.environ.get("CAPTURE_PASSWORD", "monSecret")
-
-    if submitted_password != correct_password:
-        # Mot de passe incorrect — prendre une photo et l'enregistrer
-        try:
-            os.makedirs("photos", exist_ok=True)
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            out_path = os.path.join("photos", f"photo_{ts}.png")
-            frame = core.capture_frame()
-            core.save_image(out_path, frame)
-            result["message"] = f"Mot de passe incorrect — photo enregistrée : {out_path}"
-            result["photo_path"] = out_path
-            result["status"] = "error"
-            return result
-        except Exception as e:
-            result["status"] = "error"
-            result["message"] = f"Échec de la capture photo : {e}"
-            return result
+    # Comparaison en temps constant: ne révèle pas la longueur du préfixe
+    # commun, contrairement à !=.
+    if not hmac.compare_digest(submitted_password.encode(), _CORRECT_PASSWORD):
+        # Mot de passe incorrect — prendre une photo et l'enregistrer en
+        # arrière-plan: la réponse part immédiatement, le fichier apparaît
+        # juste après.
+        out_path = core.new_photo_path()
+        _EXECUTOR.submit(_capture_and_save, out_path)
+        result["message"] = f"Mot de passe incorrect — photo enregistrée : {out_path}"
+        result["photo_path"] = out_path
+        result["status"] = "error"
+        return result
 
     # Mot de passe correct — tentative de reconnaissance faciale si disponible
-    if not getattr(core, "FACE_REC_AVAILABLE", False):
+    if not core.face_rec_available():
         result["message"] = (
             "Mot de passe correct. La bibliothèque 'face_recognition' n'est pas installée. "
             "Reconnaissance ignorée."
         )
         return result
 
-    known_encodings, known_names = core.load_known_faces("faces")
-    if not known_encodings:
+    known_encodings, known_names = core.get_known_faces("faces")
+    if len(known_encodings) == 0:
         result["message"] = (
             "Mot de passe correct. Aucun visage de référence trouvé dans 'faces'. Reconnaissance ignorée."
         )
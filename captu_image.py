@@ -14,78 +14,411 @@ from __future__ import annotations
 
 import os
 import sys
-import datetime
+import collections
+import concurrent.futures
+import functools
 import getpass
+import hmac
+import json
+import pathlib
+import threading
+import time
 import cv2
-
-# Import optionnel de face_recognition
+import numpy as np
+
+# Import optionnel et paresseux de face_recognition: importer dlib coûte
+# plusieurs centaines de ms, on ne le paye qu'au premier usage réel (ou
+# dans warm_up), pas à l'import du module par app.py ou la CLI.
+_face_rec = None  # type: ignore
+_face_rec_checked = False
+_FACE_REC_LOCK = threading.Lock()
+
+
+def _lazy_import_face_recognition():
+    """Retourne le module face_recognition, ou None s'il est indisponible."""
+    global _face_rec, _face_rec_checked
+    if not _face_rec_checked:
+        with _FACE_REC_LOCK:
+            if not _face_rec_checked:
+                try:
+                    import face_recognition  # type: ignore
+                    _face_rec = face_recognition
+                except Exception:
+                    _face_rec = None
+                _face_rec_checked = True
+    return _face_rec
+
+
+def face_rec_available() -> bool:
+    """Indique si face_recognition est utilisable (import tenté au premier appel)."""
+    return _lazy_import_face_recognition() is not None
+
+# Import optionnel de numba (accélère le noyau de distance)
 try:
-    import face_recognition  # type: ignore
-    FACE_REC_AVAILABLE = True
+    import numba  # type: ignore
+    NUMBA_AVAILABLE = True
 except Exception:
-    face_recognition = None  # type: ignore
-    FACE_REC_AVAILABLE = False
+    numba = None  # type: ignore
+    NUMBA_AVAILABLE = False
+
+
+# Nombre de frames à purger pour vider le tampon V4L2 avant la capture.
+_GRAB_FLUSH_COUNT = 4
+
+# Caméra persistante, ouverte paresseusement: ouvrir /dev/video0 coûte
+# plusieurs centaines de ms sous V4L2, on ne le paye qu'une fois.
+_CAP = None
+_CAP_LOCK = threading.Lock()
+
+
+def get_capture() -> "cv2.VideoCapture":
+    """Retourne la caméra partagée, en l'ouvrant au besoin.
+    Soulève RuntimeError si la caméra est inaccessible.
+    Doit être appelée sous _CAP_LOCK.
+    """
+    global _CAP
+    if _CAP is None or not _CAP.isOpened():
+        cap = cv2.VideoCapture(0)
+        if not cap.isOpened():
+            cap.release()
+            raise RuntimeError("Impossible d'accéder à la caméra.")
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        _CAP = cap
+    return _CAP
+
+
+def release_capture() -> None:
+    """Ferme la caméra partagée (utile après une erreur de lecture)."""
+    global _CAP
+    if _CAP is not None:
+        _CAP.release()
+        _CAP = None
 
 
 def capture_frame() -> "cv2.Mat":
-    """Capture une image depuis la caméra par défaut et retourne la frame BGR.
+    """Capture une image depuis la caméra partagée et retourne la frame BGR.
     Soulève RuntimeError en cas d'échec d'accès ou de lecture.
+
+    Le tampon du pilote est réduit à 1 frame et purgé via grab() (qui
+    avance sans décoder), puis seule la frame la plus récente est
+    décodée par retrieve() — on évite ainsi de renvoyer une frame
+    vieille de plus de ~100 ms.
     """
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        raise RuntimeError("Impossible d'accéder à la caméra.")
+    with _CAP_LOCK:
+        cap = get_capture()
 
-    try:
-        ret, frame = cap.read()
-    finally:
-        cap.release()
+        ret = False
+        for _ in range(_GRAB_FLUSH_COUNT):
+            ret = cap.grab()
+        if ret:
+            ret, frame = cap.retrieve()
 
-    if not ret or frame is None:
-        raise RuntimeError("Échec de la capture depuis la caméra.")
+        if not ret or frame is None:
+            # Caméra débranchée ou pilote en erreur: on referme pour que
+            # la prochaine tentative rouvre proprement.
+            release_capture()
+            raise RuntimeError("Échec de la capture depuis la caméra.")
 
     return frame
 
 
-def save_image(path: str, frame: "cv2.Mat") -> None:
-    """Enregistre l'image BGR au chemin spécifié."""
-    ok = cv2.imwrite(path, frame)
+def warm_up() -> None:
+    """Pré-chauffe la caméra et les modèles dlib (best effort).
+
+    Ouvre la caméra partagée et force le chargement des prédicteurs de
+    points et du ResNet d'encodage via un appel factice, pour que la
+    première vraie requête n'en paye pas le coût.
+    """
+    try:
+        with _CAP_LOCK:
+            get_capture()
+    except Exception:
+        pass
+
+    fr = _lazy_import_face_recognition()
+    if fr is not None:
+        try:
+            dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+            fr.face_encodings(dummy)
+        except Exception:
+            pass
+
+    if NUMBA_AVAILABLE:
+        # Déclenche la compilation JIT du noyau de distance maintenant
+        # (mise en cache sur disque par numba) plutôt qu'à la première requête.
+        try:
+            _argmin_sqdist(
+                np.zeros((1, 128), dtype=np.float32),
+                np.zeros(128, dtype=np.float32),
+                np.float32(_MATCH_TOLERANCE_SQ),
+            )
+        except Exception:
+            pass
+
+
+# Paramètres d'encodage JPEG pour les photos d'intrusion: qualité 85,
+# ~5-15 ms pour une frame 1080p là où le PNG par défaut prend 50-200 ms.
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85]
+
+# Dossier des photos d'intrusion, créé une fois à l'import plutôt qu'un
+# makedirs par requête.
+PHOTOS_DIR = pathlib.Path("photos")
+PHOTOS_DIR.mkdir(exist_ok=True)
+
+
+def new_photo_path() -> str:
+    """Retourne un chemin de photo unique dans photos/.
+
+    L'horodatage en nanosecondes (formaté en hexa) évite le strftime
+    locale-aware et surtout les collisions de la résolution 1 s sous
+    rafale de tentatives.
+    """
+    return str(PHOTOS_DIR / f"photo_{time.time_ns():x}.jpg")
+
+
+def save_image(path: str, frame: "cv2.Mat", params=None) -> None:
+    """Enregistre l'image BGR au chemin spécifié.
+
+    `params` est passé tel quel à cv2.imwrite (p. ex. JPEG_PARAMS).
+    """
+    ok = cv2.imwrite(path, frame, params or [])
     if not ok:
         raise RuntimeError(f"Échec de l'enregistrement de l'image: {path}")
 
 
+# Fichiers de cache des encodages (dans le dossier des visages de référence):
+# la matrice brute en .npy (chargeable en mmap, pages partagées entre
+# workers via le cache de pages de l'OS) et les noms + clé en sidecar JSON.
+_CACHE_NPY = ".cache.npy"
+_CACHE_NAMES_JSON = ".cache.names.json"
+
+# Version du format/contenu du cache. v2: encodages de référence calculés
+# avec le modèle 5 points ("small"), comme les encodages de capture — les
+# caches v1 (68 points) sont invalidés pour éviter une dérive des distances.
+_CACHE_VERSION = 2
+
+# Cache en mémoire: {dossier: (clé, encodings, names)} protégé par un verrou
+# pour éviter de relire le disque à chaque requête Flask.
+_KNOWN_CACHE: dict = {}
+_KNOWN_CACHE_LOCK = threading.Lock()
+
+
+_VALID_FACE_EXTS = {"jpg", "jpeg", "png"}
+
+
+def _faces_cache_key(folder: str):
+    """Construit la clé de cache: liste triée de (nom, mtime_ns, taille) des images.
+
+    Les DirEntry de scandir exposent directement nom, chemin et stat mis
+    en cache — pas de stat() ni de join supplémentaires par fichier.
+    Retourne None si le dossier n'existe pas.
+    """
+    entries = []
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.rpartition(".")[2].lower() not in _VALID_FACE_EXTS:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append([entry.name, st.st_mtime_ns, st.st_size])
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    entries.sort()
+    return entries
+
+
+def _load_faces_disk_cache(folder: str, key):
+    """Relit le cache disque s'il correspond à la clé, sinon retourne None.
+
+    La matrice est chargée en mmap (lecture seule): aucune
+    désérialisation ni allocation, et les pages sont partagées entre
+    processus workers par l'OS.
+    """
+    npy_path = os.path.join(folder, _CACHE_NPY)
+    json_path = os.path.join(folder, _CACHE_NAMES_JSON)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != _CACHE_VERSION or meta.get("key") != key:
+            return None
+        encodings = np.load(npy_path, mmap_mode="r")
+        if encodings.shape[0] != len(meta["names"]):
+            return None
+        return encodings, list(meta["names"])
+    except Exception:
+        return None
+
+
+def _save_faces_disk_cache(folder: str, key, encodings, names) -> None:
+    """Écrit le cache disque (best effort: une erreur d'écriture est ignorée)."""
+    try:
+        np.save(os.path.join(folder, _CACHE_NPY), np.ascontiguousarray(encodings))
+        with open(os.path.join(folder, _CACHE_NAMES_JSON), "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "key": key, "names": list(names)}, f)
+    except Exception:
+        pass
+
+
+def _encode_one(path: str):
+    """Encode un visage de référence. Retourne l'encodage ou None.
+
+    None couvre les fichiers corrompus/non lisibles et les images sans visage.
+    """
+    fr = _lazy_import_face_recognition()
+    try:
+        image = fr.load_image_file(path)  # type: ignore[union-attr]
+        # Même modèle de points (5 points) que l'encodage de capture dans
+        # recognize_face, sinon les distances dérivent entre les deux.
+        encodings = fr.face_encodings(image, num_jitters=1, model="small")  # type: ignore[union-attr]
+        return encodings[0] if encodings else None
+    except Exception:
+        return None
+
+
+def _landmark_one(raw_face_landmarks, path: str):
+    """Charge une image de référence et localise ses points de repère.
+
+    Retourne (image, points du premier visage) ou None si le fichier est
+    illisible ou sans visage. Même modèle 5 points que l'encodage de capture.
+    """
+    fr = _lazy_import_face_recognition()
+    try:
+        image = fr.load_image_file(path)  # type: ignore[union-attr]
+        landmarks = raw_face_landmarks(image, model="small")
+        return (image, landmarks[0]) if landmarks else None
+    except Exception:
+        return None
+
+
+def _batch_encode(paths):
+    """Calcule les descripteurs de référence via l'API dlib par lots.
+
+    Les images sont regroupées par résolution identique et chaque groupe
+    passe en un seul appel compute_face_descriptor — un aller-retour
+    Python↔C par groupe au lieu d'un par image.
+
+    Les symboles privés de face_recognition/dlib sont résolus AVANT la
+    passe par fichier: si l'API a changé, l'AttributeError remonte à
+    l'appelant (qui retombe sur l'encodage par image) au lieu d'être
+    avalée par le except par-fichier et de produire un cache vide.
+
+    Retourne une liste d'encodages alignée sur `paths` (None pour les
+    fichiers illisibles ou sans visage).
+    """
+    import dlib  # type: ignore
+
+    fr = _lazy_import_face_recognition()
+    raw_face_landmarks = fr.api._raw_face_landmarks  # type: ignore[union-attr]
+    face_encoder = fr.api.face_encoder  # type: ignore[union-attr]
+    full_object_detections = dlib.full_object_detections
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        results = list(ex.map(functools.partial(_landmark_one, raw_face_landmarks), paths))
+
+    groups: dict = {}
+    for i, res in enumerate(results):
+        if res is not None:
+            groups.setdefault(res[0].shape, []).append(i)
+
+    encodings = [None] * len(results)
+    for indices in groups.values():
+        batch_images = [results[i][0] for i in indices]
+        batch_faces = []
+        for i in indices:
+            detections = full_object_detections()
+            detections.append(results[i][1])
+            batch_faces.append(detections)
+        descriptors = face_encoder.compute_face_descriptor(
+            batch_images, batch_faces, 1
+        )
+        for i, image_descriptors in zip(indices, descriptors):
+            encodings[i] = np.array(image_descriptors[0])
+    return encodings
+
+
+def _encode_known_faces(folder: str, key):
+    """Encode les visages de référence listés dans la clé de cache.
+
+    L'encodeur dlib relâche le GIL pendant sa passe C++, donc les images
+    sont chargées et leurs points détectés en parallèle par un pool de
+    threads (quasi linéaire avec le nombre de cœurs, sans coût de
+    pickling), puis les descripteurs sont calculés par lots. Si l'API
+    dlib par lots n'est pas disponible, retombe sur un encodage par image.
+
+    Retourne (encodings, names) avec encodings sous forme de matrice float32.
+    """
+    paths = [os.path.join(folder, filename) for filename, _mtime, _size in key]
+
+    try:
+        encodings = _batch_encode(paths)
+    except Exception:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            encodings = list(ex.map(_encode_one, paths))
+
+    known_encodings = []
+    known_names = []
+    for (filename, _mtime, _size), encoding in zip(key, encodings):
+        if encoding is not None:
+            known_encodings.append(encoding)
+            known_names.append(os.path.splitext(filename)[0])
+
+    if not known_encodings:
+        return np.empty((0, 128), dtype=np.float32), []
+
+    return np.stack(known_encodings).astype(np.float32), known_names
+
+
 def load_known_faces(folder: str = "faces"):
     """Charge les encodages des visages connus depuis un dossier.
 
     Le nom de la personne est dérivé du nom de fichier sans extension.
     Seuls les fichiers .jpg/.jpeg/.png sont pris en compte.
 
+    Les encodages sont mis en cache sur disque (faces/.cache.npy, relu en
+    mmap) et en mémoire; ils ne sont recalculés que si les fichiers du
+    dossier ont changé.
+
     Retourne (encodings, names). Si face_recognition est indisponible, retourne ([], []).
     """
-    if not FACE_REC_AVAILABLE:
+    if not face_rec_available():
         return [], []
 
-    if not os.path.isdir(folder):
+    key = _faces_cache_key(folder)
+    if key is None:
         return [], []
 
-    valid_exts = (".jpg", ".jpeg", ".png")
-    known_encodings = []
-    known_names = []
+    with _KNOWN_CACHE_LOCK:
+        cached = _KNOWN_CACHE.get(folder)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
 
-    for filename in os.listdir(folder):
-        if not filename.lower().endswith(valid_exts):
-            continue
-        path = os.path.join(folder, filename)
-        try:
-            image = face_recognition.load_image_file(path)  # type: ignore[attr-defined]
-            encodings = face_recognition.face_encodings(image)  # type: ignore[attr-defined]
-            if encodings:
-                known_encodings.append(encodings[0])
-                known_names.append(os.path.splitext(filename)[0])
-        except Exception:
-            # Ignore les fichiers corrompus/non lisibles
-            continue
+        loaded = _load_faces_disk_cache(folder, key)
+        if loaded is None:
+            encodings, names = _encode_known_faces(folder, key)
+            _save_faces_disk_cache(folder, key, encodings, names)
+        else:
+            encodings, names = loaded
+
+        # Normalise en ndarray float32 de base une fois pour toutes (vue
+        # sans copie sur un memmap): l'asarray par requête dans
+        # recognize_face renvoie alors ce même objet, condition de la
+        # mémoïsation par identité de _quantize_known.
+        encodings = np.asarray(encodings, dtype=np.float32)
+        _KNOWN_CACHE[folder] = (key, encodings, names)
+        # Les visages de référence ont changé: les résultats mémorisés
+        # par hash de frame ne sont plus valables.
+        _hash_cache_clear()
+        return encodings, names
 
-    return known_encodings, known_names
+
+def get_known_faces(folder: str = "faces"):
+    """Retourne (encodings, names) depuis le cache, en le (re)construisant au besoin."""
+    return load_known_faces(folder)
 
 
 essential_msg_rec_ignored = (
@@ -93,23 +426,264 @@ essential_msg_rec_ignored = (
 )
 
 
+# Tolérance de face_recognition (distance euclidienne); comparée au carré
+# de la distance pour éviter le sqrt.
+_MATCH_TOLERANCE_SQ = 0.6 ** 2
+
+# Réduction de la frame avant encodage: facteur et taille minimale (petit côté)
+# en dessous de laquelle on ne réduit plus.
+_DOWNSCALE_FACTOR = 0.25
+_MIN_SMALL_SIDE = 300
+
+
+def _small_rgb_frame(frame: "np.ndarray") -> "np.ndarray":
+    """Réduit la frame BGR (si elle reste assez grande) et la passe en RGB.
+
+    Le détecteur HOG parcourt toute l'image: à 0.25x on traite ~16x moins
+    de pixels. L'échange BGR→RGB se fait par une vue à pas inversé
+    (frame[:, :, ::-1]) au lieu de cv2.cvtColor, qui écrivait un tampon
+    H×W×3 complet (~6 Mo en 1080p); la copie contiguë exigée par dlib ne
+    porte que sur la petite frame (1/16 des octets).
+    """
+    h, w = frame.shape[:2]
+    # Facteur borné pour que le petit côté ne descende pas sous
+    # _MIN_SMALL_SIDE: 1080p atterrit à ~300 px, 720p à 300 px, au lieu
+    # de rester en pleine résolution.
+    factor = min(1.0, max(_DOWNSCALE_FACTOR, _MIN_SMALL_SIDE / min(h, w)))
+    if factor < 1.0:
+        frame = cv2.resize(
+            frame,
+            (0, 0),
+            fx=factor,
+            fy=factor,
+            interpolation=cv2.INTER_AREA,
+        )
+    return np.ascontiguousarray(frame[:, :, ::-1])
+
+
+# Version int8 de la matrice des encodages connus, mémoïsée par identité
+# de la matrice source (le cache renvoie toujours le même ndarray).
+_QUANT_MEMO = None
+_QUANT_LOCK = threading.Lock()
+
+
+def _quantize_known(known_matrix: "np.ndarray"):
+    """Retourne (matrice int8, échelle) pour la matrice des encodages connus.
+
+    Les encodages dlib sont bornés (~[-0.3, 0.3]): en int8 la matrice
+    occupe 4x moins de mémoire, ce qui domine le coût de la passe de
+    distance quand N grandit.
+    """
+    global _QUANT_MEMO
+    with _QUANT_LOCK:
+        memo = _QUANT_MEMO
+        if memo is not None and memo[0] is known_matrix:
+            return memo[1], memo[2]
+        scale = 127.0 / max(float(np.max(np.abs(known_matrix))), 1e-6)
+        known_q = np.round(known_matrix * scale).astype(np.int8)
+        _QUANT_MEMO = (known_matrix, known_q, scale)
+        return known_q, scale
+
+
+if NUMBA_AVAILABLE:
+
+    @numba.njit(fastmath=True, cache=True)  # type: ignore[misc]
+    def _argmin_sqdist(known, probe, threshold):
+        """Indice du plus proche voisin sous le seuil (carré), ou -1.
+
+        Boucle explicite sur les 128 dimensions: LLVM l'auto-vectorise
+        (AVX2/AVX-512) et, contrairement à la version NumPy, aucune
+        matrice temporaire (N, 128) n'est allouée.
+        """
+        best = -1
+        best_dist = threshold
+        for i in range(known.shape[0]):
+            s = np.float32(0.0)
+            for j in range(known.shape[1]):
+                d = known[i, j] - probe[j]
+                s += d * d
+            if s < best_dist:
+                best_dist = s
+                best = i
+        return best
+
+
+def _best_match(known_matrix: "np.ndarray", captured_encoding: "np.ndarray"):
+    """Retourne l'indice du visage connu le plus proche, ou -1 si aucun ne passe la tolérance.
+
+    Avec numba: noyau JIT compilé sans temporaires sur la matrice float32.
+    Sinon: une passe NumPy vectorisée sur la matrice (N, 128) quantifiée
+    en int8 au lieu d'une boucle Python par encodage. Les différences
+    sont élargies en int32 avant le carré (un écart de ±254 au carré,
+    sommé sur 128 dimensions, déborderait un int16).
+    """
+    if NUMBA_AVAILABLE:
+        return int(
+            _argmin_sqdist(
+                np.ascontiguousarray(known_matrix, dtype=np.float32),
+                np.ascontiguousarray(captured_encoding, dtype=np.float32),
+                np.float32(_MATCH_TOLERANCE_SQ),
+            )
+        )
+
+    known_q, scale = _quantize_known(known_matrix)
+    captured_q = np.clip(np.round(captured_encoding * scale), -127, 127).astype(np.int8)
+
+    diffs = known_q.astype(np.int32) - captured_q.astype(np.int32)
+    dists = np.einsum("ij,ij->i", diffs, diffs)
+    idx = int(dists.argmin())
+    if dists[idx] < _MATCH_TOLERANCE_SQ * scale * scale:
+        return idx
+    return -1
+
+
+# Cache LRU "dernier visage vu": pHash 64 bits de la frame → résultat de
+# reconnaissance. Sur des frames identiques ou quasi identiques (scans
+# répétés), on évite tout le pipeline ResNet + distances pour le coût
+# d'une DCT 8×8 (~100 µs).
+_HASH_CACHE: "collections.OrderedDict[bytes, object]" = collections.OrderedDict()
+_HASH_CACHE_MAX = 64
+_HASH_CACHE_LOCK = threading.Lock()
+_HASH_MISS = object()
+
+
+def _frame_phash(frame: "np.ndarray") -> bytes:
+    """Hash perceptuel 64 bits de la frame (DCT 8×8 du gris réduit à 32×32)."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(small.astype(np.float32))
+    block = dct[:8, :8].ravel()
+    bits = block > np.median(block)
+    return np.packbits(bits).tobytes()
+
+
+def _hash_cache_get(phash: bytes):
+    """Retourne le résultat mémorisé pour ce hash, ou _HASH_MISS."""
+    with _HASH_CACHE_LOCK:
+        if phash in _HASH_CACHE:
+            _HASH_CACHE.move_to_end(phash)
+            return _HASH_CACHE[phash]
+        return _HASH_MISS
+
+
+def _hash_cache_put(phash: bytes, person) -> None:
+    """Mémorise le résultat pour ce hash, en évinçant le plus ancien si plein."""
+    with _HASH_CACHE_LOCK:
+        _HASH_CACHE[phash] = person
+        _HASH_CACHE.move_to_end(phash)
+        while len(_HASH_CACHE) > _HASH_CACHE_MAX:
+            _HASH_CACHE.popitem(last=False)
+
+
+def _hash_cache_clear() -> None:
+    with _HASH_CACHE_LOCK:
+        _HASH_CACHE.clear()
+
+
+# Pré-détecteur YuNet: réseau ONNX léger (~1-2 ms à 320×240) qui évite de
+# payer HOG + ResNet quand il n'y a personne devant la caméra. Optionnel:
+# si le fichier modèle est absent, on retombe sur le détecteur HOG.
+_YUNET_MODEL_PATH = "face_detection_yunet_2023mar.onnx"
+_YUNET_INPUT_SIZE = (320, 240)
+_YUNET = None
+_YUNET_FAILED = False
+_YUNET_LOCK = threading.Lock()
+
+
+def _get_yunet():
+    """Retourne le détecteur YuNet partagé, ou None s'il est indisponible.
+    Doit être appelée sous _YUNET_LOCK.
+    """
+    global _YUNET, _YUNET_FAILED
+    if _YUNET is None and not _YUNET_FAILED:
+        try:
+            _YUNET = cv2.FaceDetectorYN_create(
+                _YUNET_MODEL_PATH, "", _YUNET_INPUT_SIZE
+            )
+        except Exception:
+            # Modèle absent ou OpenCV sans support DNN
+            _YUNET_FAILED = True
+    return _YUNET
+
+
+def _prefilter_face_locations(frame: "np.ndarray", rgb_small: "np.ndarray"):
+    """Détecte les visages avec YuNet sur une frame BGR 320×240.
+
+    Retourne les boîtes (top, right, bottom, left) dans les coordonnées
+    de rgb_small, [] si aucun visage, ou None si YuNet est indisponible
+    (l'appelant retombe alors sur HOG).
+    """
+    with _YUNET_LOCK:
+        detector = _get_yunet()
+        if detector is None:
+            return None
+        small_bgr = cv2.resize(frame, _YUNET_INPUT_SIZE, interpolation=cv2.INTER_AREA)
+        try:
+            _, faces = detector.detect(small_bgr)
+        except Exception:
+            return None
+
+    if faces is None or len(faces) == 0:
+        return []
+
+    sx = rgb_small.shape[1] / _YUNET_INPUT_SIZE[0]
+    sy = rgb_small.shape[0] / _YUNET_INPUT_SIZE[1]
+    locations = []
+    for x, y, w, h in faces[:, :4]:
+        locations.append(
+            (int(y * sy), int((x + w) * sx), int((y + h) * sy), int(x * sx))
+        )
+    return locations
+
+
 def recognize_face(frame: "cv2.Mat", known_encodings, known_names):
     """Retourne le nom de la personne reconnue ou None.
     Nécessite face_recognition disponible et des encodages connus non vides.
+    Le meilleur candidat (distance minimale) est retenu, pas le premier sous le seuil.
+
+    Le résultat est mémorisé par hash perceptuel de la frame: une frame
+    identique ou quasi identique (scans répétés) court-circuite tout le
+    pipeline de détection/encodage.
     """
-    if not FACE_REC_AVAILABLE or not known_encodings:
+    fr = _lazy_import_face_recognition()
+    if fr is None or len(known_encodings) == 0:
         return None
 
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    encodings = face_recognition.face_encodings(rgb_frame)  # type: ignore[attr-defined]
+    phash = _frame_phash(frame)
+    cached = _hash_cache_get(phash)
+    if cached is not _HASH_MISS:
+        return cached
+
+    person = _recognize_face_uncached(fr, frame, known_encodings, known_names)
+    _hash_cache_put(phash, person)
+    return person
+
+
+def _recognize_face_uncached(fr, frame: "cv2.Mat", known_encodings, known_names):
+    """Pipeline complet de reconnaissance (détection, encodage, distances)."""
+    rgb_small = _small_rgb_frame(frame)
+    locations = _prefilter_face_locations(frame, rgb_small)
+    if locations is None:
+        locations = fr.face_locations(rgb_small, model="hog")
+    if not locations:
+        return None
+
+    # La détection étant déjà faite, face_encodings saute son passage
+    # interne du détecteur; le modèle 5 points suffit pour l'encodage.
+    encodings = fr.face_encodings(
+        rgb_small,
+        known_face_locations=locations,
+        num_jitters=1,
+        model="small",
+    )
     if not encodings:
         return None
 
-    captured_encoding = encodings[0]
-    results = face_recognition.compare_faces(known_encodings, captured_encoding)  # type: ignore[attr-defined]
-    if True in results:
-        index = results.index(True)
-        return known_names[index]
+    captured_encoding = np.asarray(encodings[0], dtype=np.float32)
+    known_matrix = np.asarray(known_encodings, dtype=np.float32)
+    idx = _best_match(known_matrix, captured_encoding)
+    if idx >= 0:
+        return known_names[idx]
     return None
 
 
@@ -122,14 +696,12 @@ def main() -> None:
         print("Impossible de lire le mot de passe.")
         sys.exit(1)
 
-    if password != CORRECT_PASSWORD:
+    if not hmac.compare_digest(password.encode(), CORRECT_PASSWORD.encode()):
         # Mot de passe incorrect: capture et enregistre la photo
         try:
-            os.makedirs("photos", exist_ok=True)
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            out_path = os.path.join("photos", f"photo_{ts}.png")
+            out_path = new_photo_path()
             frame = capture_frame()
-            save_image(out_path, frame)
+            save_image(out_path, frame, params=JPEG_PARAMS)
             print(f"Mot de passe incorrect — photo enregistrée : {out_path}")
         except Exception as e:
             print("Échec de la capture photo :", e)
@@ -140,12 +712,12 @@ def main() -> None:
     print("Mot de passe correct.")
 
     # Reconnaissance faciale si possible
-    if not FACE_REC_AVAILABLE:
+    if not face_rec_available():
         print(essential_msg_rec_ignored)
         return
 
-    known_encodings, known_names = load_known_faces("faces")
-    if not known_encodings:
+    known_encodings, known_names = get_known_faces("faces")
+    if len(known_encodings) == 0:
         print("Aucun visage de référence trouvé dans 'faces'. Reconnaissance ignorée.")
         return
 